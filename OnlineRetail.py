@@ -1,17 +1,22 @@
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Plots are only saved to files, no GUI window needed
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from retail_pipeline import compute_rfm, line_revenue, load_and_clean, plot_monthly
+
 # ------------------------------
 # Step 1: Load Dataset
 # ------------------------------__=r"C:\Users\Asif Hossain\Desktop\Dataset\Python Cheat Sheet\Online Retail\Online Retail.csv"
 file=r"C:\Users\Asif Hossain\Desktop\Dataset\Online Retail Visualisation\Online Retail.csv"
-df = pd.read_csv(file, encoding='latin1')
+df = load_and_clean(file)  # Steps 1-4 (load, clean, add TotalPrice), cached as Parquet
 
 # ------------------------------
 # Step 2: Initial Data Exploration
 # ------------------------------
-print("Initial Data Preview:")
+print("Cleaned Data Preview:")
 print(df.head())  # Show first 5 rows to understand data structure
 
 print("\nDataset Info:")
@@ -20,29 +25,16 @@ df.info()  # Summary of columns, data types, and non-null counts
 print("\nStatistical Summary:")
 df.describe()  # Basic stats (mean, std, min, max) for numeric columns
 
-# ------------------------------
-# Step 3: Data Cleaning
-# ------------------------------
-df = df.drop_duplicates()  # Remove exact duplicate rows to avoid double counting
-df = df.dropna(subset=['CustomerID', 'Description'])  # Drop rows with missing critical info
-df = df[(df['UnitPrice'] > 0) & (df['Quantity'] > 0)]  # Remove rows with invalid values
-
-# ------------------------------
-# Step 4: Feature Engineering
-# ------------------------------
-df["TotalPrice"] = df["Quantity"] * df["UnitPrice"]
-df['InvoiceDate'] = pd.to_datetime(df['InvoiceDate'])
-df['Year'] = df['InvoiceDate'].dt.year
-df['Month'] = df['InvoiceDate'].dt.month
+revenue = line_revenue(df)  # Per-row revenue in float64, so the reported totals are not built from float32 TotalPrice
 
 # ------------------------------
 # Step 5: Top Products by Revenue
 # ------------------------------
 top_products = (
-    df.groupby("Description")[["TotalPrice"]]
+    revenue.groupby(df["Description"], observed=True, sort=False)
     .sum()
-    .sort_values("TotalPrice", ascending=False)
-    .head(10)  # Get top 10 products
+    .nlargest(10)  # Get top 10 products
+    .round(2)
 )
 print("\nTop 10 Products by Revenue:")
 print(top_products)
@@ -50,42 +42,25 @@ print(top_products)
 # ------------------------------
 # Step 6: Monthly Revenue Trends
 # ------------------------------
-monthly_revenue = df.groupby(['Year', 'Month'])['TotalPrice'].sum().reset_index()
-plt.figure(figsize=(10, 6), facecolor='black')
-ax = plt.gca()
-ax.set_facecolor('black')
-
-plt.plot(monthly_revenue['Month'], monthly_revenue['TotalPrice'], marker='o', color='white')
-plt.xlabel('Month', color='white', fontsize=16)
-plt.ylabel('Total Revenue', color='white', fontsize=16)
-plt.title('Monthly Revenue Over Time', color='white', fontsize=18)
-plt.xticks(color='white', fontsize=14)
-plt.yticks(color='white', fontsize=14)
-plt.grid(True, color='gray')
-plt.tight_layout()
-
-# Save the plot
-plt.savefig('monthly_revenue.png', dpi=300, bbox_inches='tight')
-plt.show()
+plot_monthly(df, 'monthly_revenue.png')
 
 # ------------------------------
 # Step 7: Top Countries by Revenue
 # ------------------------------
 country_revenue = (
-    df.groupby("Country")["TotalPrice"]
+    revenue.groupby(df["Country"], observed=True, sort=False)
     .sum()
-    .sort_values(ascending=False)
-    .reset_index()
+    .nlargest(10)  # Only the top 10 are printed and the top 5 plotted
+    .round(2)
 )
 
 print("\nTop Countries by Revenue:")
-print(country_revenue.head(10))
+print(country_revenue)
 
 # ------------------------------
 # Step 8: Average Revenue per Customer
 # ------------------------------
-avg_revenue = df.groupby("CustomerID")[["TotalPrice"]].mean()
-avg_revenue.index = avg_revenue.index.astype(int)  # Convert CustomerID to int for clarity
+avg_revenue = revenue.groupby(df["CustomerID"]).mean().round(2).to_frame()  # CustomerID is already an int
 
 print("\nAverage Revenue per Customer:")
 print(avg_revenue.head())
@@ -93,8 +68,12 @@ print(avg_revenue.head())
 # ------------------------------
 # Step 9: Correlation Analysis
 # ------------------------------
-numeric_df = df.select_dtypes(include='number').drop(columns=['CustomerID', 'Year', 'Month'])
-correlation_matrix = numeric_df.corr()
+numeric_cols = ['Quantity', 'UnitPrice', 'TotalPrice']
+correlation_matrix = pd.DataFrame(
+    np.corrcoef(np.stack([df[col].to_numpy() for col in numeric_cols])),  # Rows are variables
+    index=numeric_cols,
+    columns=numeric_cols,
+)
 
 plt.figure(figsize=(6, 5), facecolor='black')
 sns.heatmap(
@@ -113,33 +92,14 @@ plt.tight_layout()
 
 # Save the plot
 plt.savefig('correlation_heatmap.png', dpi=300, bbox_inches='tight')
-plt.show()
+plt.close()
 
 # ------------------------------
 # Step 10: Customer Segmentation Using RFM
 # ------------------------------
-latest_date = df['InvoiceDate'].max() + pd.Timedelta(days=1)
-recency_df = df.groupby('CustomerID')['InvoiceDate'].max().reset_index()
-recency_df['Recency'] = (latest_date - recency_df['InvoiceDate']).dt.days
-recency_df = recency_df[['CustomerID', 'Recency']]
-
-frequency_df = df.groupby('CustomerID')['InvoiceNo'].nunique().reset_index()
-frequency_df.rename(columns={"InvoiceNo": "Frequency"}, inplace=True)
-
-monetary_df = df.groupby('CustomerID')['TotalPrice'].sum().reset_index()
-monetary_df.rename(columns={"TotalPrice": "Monetary"}, inplace=True)
-
-rfm = recency_df.merge(frequency_df, on='CustomerID').merge(monetary_df, on='CustomerID')
-rfm['R_Score'] = pd.qcut(rfm['Recency'], 10, labels=range(10, 0, -1)).astype(int)
-rfm['F_Score'] = pd.qcut(rfm['Frequency'].rank(method='first'), 10, labels=range(1, 11)).astype(int)
-rfm['M_Score'] = pd.qcut(rfm['Monetary'], 10, labels=range(1, 11)).astype(int)
-rfm['RFM_Score'] = (
-    rfm['R_Score'].astype(str) +
-    rfm['F_Score'].astype(str) +
-    rfm['M_Score'].astype(str)
-)
+rfm = compute_rfm(df)
 
-best_customers = rfm[rfm['RFM_Score'] == '101010']
+best_customers = rfm[rfm['RFM_Score'] == 101010]
 print("\nBest Customers (RFM Score = 101010):")
 print(best_customers)
 
@@ -150,25 +110,25 @@ sns.histplot(rfm['Recency'], bins=20, kde=True)
 plt.title("Recency Distribution")
 # Save the plot
 plt.savefig('recency_distribution.png', dpi=300, bbox_inches='tight')
-plt.show()
+plt.close()
 
 sns.histplot(rfm['Frequency'], bins=20, kde=True)
 plt.title("Frequency Distribution")
 # Save the plot
 plt.savefig('frequency_distribution.png', dpi=300, bbox_inches='tight')
-plt.show()
+plt.close()
 
 sns.histplot(rfm['Monetary'], bins=20, kde=True)
 plt.title("Monetary Distribution")
 # Save the plot
 plt.savefig('monetary_distribution.png', dpi=300, bbox_inches='tight')
-plt.show()
+plt.close()
 
 # ------------------------------
 # Step 12: Visualize Top 5 Countries by Revenue
 # ------------------------------
 top5_countries = country_revenue.head(5)
-sns.barplot(x="Country", y="TotalPrice", data=top5_countries)
+top5_countries.plot.bar()
 plt.xlabel("Country", fontsize=14)
 plt.ylabel("Revenue", fontsize=14)
 plt.title("Top 5 Countries by Total Revenue", fontsize=18)
@@ -178,4 +138,4 @@ plt.tight_layout()
 
 # Save the plot
 plt.savefig('top_5_countries_by_revenue.png', dpi=300, bbox_inches='tight')
-plt.show()
+plt.close()
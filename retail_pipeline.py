@@ -0,0 +1,156 @@
+"""Loading, cleaning and RFM helpers shared by the Online Retail analysis scripts."""
+import functools
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+CACHE_VERSION = 3  # Bump whenever read_raw or clean change what ends up in the cache
+
+CSV_DTYPES = {
+    'InvoiceNo': 'category',  # Repeated text columns are stored as small integer codes
+    'StockCode': 'category',
+    'Description': 'category',
+    'Country': 'category',
+    'CustomerID': 'Int32',  # Nullable int, keeps missing IDs as <NA> instead of float NaN
+    'Quantity': 'Int32',
+    'UnitPrice': 'float32',
+}
+
+
+def read_raw(path):
+    """Read the raw Online Retail CSV with compact dtypes."""
+    return pd.read_csv(
+        path,
+        encoding='latin1',
+        engine='pyarrow',  # Multithreaded Arrow parser
+        dtype=CSV_DTYPES,
+        parse_dates=['InvoiceDate'],
+    )
+
+
+def clean(df):
+    """Drop invalid, incomplete and repeated rows and add TotalPrice."""
+    # Cleaning and feature engineering run as one chain so only the final frame is kept
+    return (
+        df.loc[(df['UnitPrice'] > 0) & (df['Quantity'] > 0)]  # Remove rows with invalid values first, it is the cheapest filter
+        .dropna(subset=['CustomerID', 'Description'])  # Drop rows with missing critical info
+        .drop_duplicates()  # Remove exact duplicate rows to avoid double counting, cheap now that every column is a code or a number
+        .astype({'Quantity': 'int32', 'CustomerID': 'int32'})  # No missing values left, so use plain 32-bit ints
+        .assign(
+            InvoiceNo=lambda d: d['InvoiceNo'].cat.remove_unused_categories(),  # Codes stay contiguous for the RFM pass
+            TotalPrice=lambda d: (d['Quantity'] * d['UnitPrice']).astype('float32'),
+        )
+    )
+
+
+def line_revenue(df):
+    """Return Quantity * UnitPrice per row in float64, for totals shown in reports.
+
+    The stored TotalPrice column is float32 and is rounded again on each row.
+    UnitPrice itself is loaded as float32 (about 7 significant digits), so
+    this still limits how exact the products are, most of all for very large
+    quantities.
+    """
+    return df['Quantity'].astype('float64') * df['UnitPrice'].astype('float64')
+
+
+def cache_path(path):
+    """Return the Parquet cache file for the CSV at ``path``.
+
+    The name depends on the absolute source path and ``CACHE_VERSION``, so
+    different CSVs and older cleaning code never share a cache file.
+    """
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+    return f'retail_clean_{digest}_v{CACHE_VERSION}.parquet'
+
+
+@functools.lru_cache(maxsize=None)
+def _load_and_clean(path, mtime):
+    cache = cache_path(path)
+    if os.path.exists(cache) and os.path.getmtime(cache) >= mtime:
+        return pd.read_parquet(cache)
+    df = clean(read_raw(path))
+    tmp = f'{cache}.{os.getpid()}.tmp'
+    df.to_parquet(tmp, compression='zstd')  # Categories and dtypes are kept in the file
+    os.replace(tmp, cache)  # An interrupted write never leaves a complete-looking cache behind
+    return df
+
+
+def load_and_clean(path):
+    """Return the cleaned frame for the CSV at ``path``.
+
+    The frame is read from that CSV's own Parquet cache (see ``cache_path``)
+    when the cache is newer than the CSV. Otherwise it is rebuilt and saved.
+    The result is also kept in memory under the same path and modification
+    time, so callers must not change it in place.
+    """
+    path = os.path.abspath(path)
+    return _load_and_clean(path, os.path.getmtime(path))
+
+
+def qscore(x, reverse=False):
+    """Score values 1-10 by decile, same bins as pd.qcut(x, 10)."""
+    x = np.asarray(x)
+    bins = np.quantile(x, np.linspace(0, 1, 11))
+    score = np.searchsorted(bins[1:-1], x, side='left') + 1  # Bins are right-closed like qcut
+    return 11 - score if reverse else score
+
+
+def compute_rfm(df):
+    """Return one row per customer with Recency, Frequency, Monetary and their scores."""
+    latest_date = df['InvoiceDate'].max() + pd.Timedelta(days=1)
+
+    # Sort rows once by customer and invoice, then reduce each customer's block of rows in one pass
+    # Customer ID in the high 32 bits and invoice code in the low 32 bits, so one int64 sort orders both
+    key = (df['CustomerID'].to_numpy().astype(np.int64) << 32) | df['InvoiceNo'].cat.codes.to_numpy().astype(np.int64)
+    order = np.argsort(key)
+    key = key[order]
+    cid = key >> 32
+    dates = df['InvoiceDate'].to_numpy()[order]
+    price = line_revenue(df).to_numpy()[order]
+
+    new_customer = np.r_[True, cid[1:] != cid[:-1]]
+    new_invoice = np.r_[True, key[1:] != key[:-1]]  # First row of each invoice per customer
+    starts = np.flatnonzero(new_customer)
+
+    rfm = pd.DataFrame({
+        'CustomerID': cid[starts],
+        'Recency': (latest_date.to_datetime64() - np.maximum.reduceat(dates, starts)) // np.timedelta64(1, 'D'),
+        'Frequency': np.add.reduceat(new_invoice, starts, dtype=np.int64),
+        'Monetary': np.add.reduceat(price, starts),
+    })
+    rfm['R_Score'] = qscore(rfm['Recency'], reverse=True)  # Recent buyers get the high scores
+    rfm['F_Score'] = qscore(rfm['Frequency'].rank(method='first'))  # Rank first to break ties
+    rfm['M_Score'] = qscore(rfm['Monetary'])
+    rfm['RFM_Score'] = rfm['R_Score'] * 10000 + rfm['F_Score'] * 100 + rfm['M_Score']  # e.g. 10, 10, 10 -> 101010
+    return rfm
+
+
+def plot_monthly(df, out):
+    """Plot total revenue per calendar month and save it to ``out``."""
+    monthly_revenue = (
+        line_revenue(df)
+        .set_axis(df['InvoiceDate'])
+        .resample('MS')  # One row per calendar month
+        .sum()
+    )
+    plt.figure(figsize=(10, 6), facecolor='black')
+    ax = plt.gca()
+    ax.set_facecolor('black')
+
+    monthly_revenue.plot(ax=ax, marker='o', color='white', x_compat=True)  # x_compat keeps plain date ticks so the styling below applies
+    plt.xlabel('Month', color='white', fontsize=16)
+    plt.ylabel('Total Revenue', color='white', fontsize=16)
+    plt.title('Monthly Revenue Over Time', color='white', fontsize=18)
+    plt.xticks(color='white', fontsize=14)
+    plt.yticks(color='white', fontsize=14)
+    plt.grid(True, color='gray')
+    plt.tight_layout()
+
+    # Save the plot
+    plt.savefig(out, dpi=300, bbox_inches='tight')
+    plt.close()
+    return monthly_revenue